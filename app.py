@@ -4,14 +4,20 @@ import sys
 
 app = Flask(__name__)
 
+# Proceso PyQt vivo entre peticiones: evita pagar el arranque del intérprete
+# y la importación de PyQt en cada clic.
+_qt_proc = None
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/run_qt')
 def run_qt():
-    # Ejecuta el archivo de la aplicación PyQt
-    subprocess.Popen([sys.executable, 'qt_app.py'])
+    global _qt_proc
+    if _qt_proc is not None and _qt_proc.poll() is None:
+        return "Aplicación PyQt ya en ejecución"
+    _qt_proc = subprocess.Popen([sys.executable, 'qt_app.py'])
     return "Aplicación PyQt ejecutándose"
 
 if __name__ == '__main__':
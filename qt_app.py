@@ -1,39 +1,115 @@
+import bisect
 import sys
 import re
+from itertools import islice, takewhile
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPlainTextEdit, QDockWidget, QTreeWidget, 
                              QAction, QVBoxLayout, QMenuBar, QToolBar, QStatusBar, QFileDialog, 
                              QTreeWidgetItem, QTabWidget, QWidget, QTextEdit, QCompleter)
-from PyQt5.QtCore import Qt, QRect, QSize, pyqtSignal
-from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont, QColor, QPainter, QIcon, QTextCursor
+from PyQt5.QtCore import Qt, QRect, QSize, pyqtSignal, QStringListModel, QTimer, QThread
+from PyQt5.QtGui import (QSyntaxHighlighter, QTextCharFormat, QFont, QColor, QPainter, QIcon,
+                         QTextCursor, QStaticText, QTransform)
+
+_KEYWORDS = frozenset({"inicio", "fin", "funcion", "retornar", "var", "mientras", "si",
+                       "entonces", "fin_si", "sino", "para", "imprimir"})
+
+# Especificación de tokens del lexer, compilada una sola vez al importar el
+# módulo. Sin alternativas SKIP/MISMATCH: los espacios se detectan como huecos
+# entre matches y un hueco no-blanco es un error léxico.
+_TOKEN_SPEC = [
+    ('STRING',  r'"[^"]*"'),       # String literal
+    ('NUMBER',  r'\d+'),           # Integer or decimal number
+    ('ID',      r'[A-Za-z_]\w*'),  # Identifiers
+    ('OP',      r'[+\-*/=<>]'),    # Arithmetic and comparison operators
+    ('NEWLINE', r'\n'),            # Line endings
+]
+_LEXER_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in _TOKEN_SPEC))
+
+_IDENT_RE = re.compile(r'[A-Za-z_]\w*')
+
+# Prefijos de etiquetas del árbol de sintaxis: internados y concatenados en
+# lugar de re-crear el literal dentro de un f-string por cada nodo.
+_LBL_IMPRIMIR = sys.intern('imprimir ')
+_LBL_SI = sys.intern('si ')
+_LBL_FUNCION = sys.intern('funcion ')
+_LBL_PARA = sys.intern('para ')
+
+# Patrones de validar_codigo, precompilados para no depender del caché
+# interno (y acotado) de re en un bucle por línea.
+_RE_VAR = re.compile(r'^var\s+\w+\s*=\s*.+$')
+_RE_FUNC = re.compile(r'^funcion\s+\w+\s*\(.*\)\s*$')
+_RE_IMPRIMIR = re.compile(r'^imprimir\s+.+$')
+_RE_SI = re.compile(r'^si\s+.+\s+entonces\s*$')
+_RE_PARA = re.compile(r'^para\s+var\s+\w+\s*=\s*.+;\s*.+;\s*.+$')
 
 class SyntaxHighlighter(QSyntaxHighlighter):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._highlighting_rules = []
+        # Durante una carga masiva (setPlainText de un archivo) el resaltado
+        # se pospone; ver CodeEditor.setPlainTextBulk.
+        self._bulk_loading = False
 
         keyword_format = QTextCharFormat()
         keyword_format.setForeground(Qt.darkBlue)
         keyword_format.setFontWeight(QFont.Bold)
 
-        keywords = ["inicio", "fin", "funcion", "retornar", "var", "mientras", "si", "entonces", "fin_si", "sino", "para", "imprimir"]
-        for word in keywords:
-            pattern = re.compile(f"\\b{word}\\b")
-            rule = (pattern, keyword_format)
-            self._highlighting_rules.append(rule)
-
         string_format = QTextCharFormat()
         string_format.setForeground(Qt.darkGreen)
-        self._highlighting_rules.append((re.compile(r'"[^"]*"'), string_format))
+
+        # Una sola expresión con grupos nombrados: un único recorrido por
+        # bloque en lugar de un finditer por regla. Las palabras clave salen
+        # del conjunto único a nivel de módulo.
+        self._master_re = re.compile(
+            r'(?P<keyword>\b(?:' + '|'.join(map(re.escape, sorted(_KEYWORDS))) + r')\b)|(?P<string>"[^"]*")'
+        )
+        # Tupla indexada por número de grupo: match.lastindex (entero en C) es
+        # más barato que la búsqueda por nombre de match.lastgroup.
+        self._fmts_tuple = (keyword_format, string_format)
 
         error_format = QTextCharFormat()
         error_format.setForeground(Qt.red)
         self._error_format = error_format
 
+        # Tramos calculados por bloque, clave número de bloque -> (hash del
+        # texto, tramos). Qt borra los formatos antes de cada highlightBlock,
+        # así que un acierto re-aplica los tramos guardados sin re-escanear.
+        self._span_cache = {}
+
     def highlightBlock(self, text):
-        for pattern, format in self._highlighting_rules:
-            for match in pattern.finditer(text):
-                start, end = match.span()
-                self.setFormat(start, end - start, format)
+        if self._bulk_loading:
+            return
+        # Las reglas no cruzan líneas: el estado de bloque queda siempre en 0
+        # para que Qt nunca propague un re-resaltado a los bloques siguientes.
+        # Nunca llamar a rehighlight() global desde aquí.
+        self.setCurrentBlockState(0)
+        block_num = self.currentBlock().blockNumber()
+        text_hash = hash(text)
+        cached = self._span_cache.get(block_num)
+        if cached is not None and cached[0] == text_hash:
+            for start, length, fmt in cached[1]:
+                self.setFormat(start, length, fmt)
+            return
+        fmts = self._fmts_tuple
+        # Tramos adyacentes con el mismo formato se funden en un único
+        # setFormat para reducir los cruces de frontera Python/C++.
+        spans = []
+        run_start = 0
+        run_end = 0
+        run_fmt = None
+        for match in self._master_re.finditer(text):
+            group = match.lastindex
+            start, end = match.span(group)
+            fmt = fmts[group - 1]
+            if fmt is run_fmt and start == run_end:
+                run_end = end
+                continue
+            if run_fmt is not None:
+                spans.append((run_start, run_end - run_start, run_fmt))
+            run_start, run_end, run_fmt = start, end, fmt
+        if run_fmt is not None:
+            spans.append((run_start, run_end - run_start, run_fmt))
+        for start, length, fmt in spans:
+            self.setFormat(start, length, fmt)
+        self._span_cache[block_num] = (text_hash, tuple(spans))
 
     def highlightError(self, start, end):
         self.setFormat(start, end - start, self._error_format)
@@ -42,6 +118,21 @@ class LineNumberArea(QWidget):
     def __init__(self, editor):
         super().__init__(editor)
         self.codeEditor = editor
+        # Glifos ya formados por número de línea; se invalida al cambiar la fuente.
+        self._static_numbers = {}
+
+    def staticNumber(self, number):
+        st = self._static_numbers.get(number)
+        if st is None:
+            st = QStaticText(str(number))
+            # El layout (y por tanto size()) debe medirse con la fuente del
+            # editor, no con la fuente por defecto de la aplicación.
+            st.prepare(QTransform(), self.codeEditor.font())
+            self._static_numbers[number] = st
+        return st
+
+    def invalidateNumberCache(self):
+        self._static_numbers.clear()
 
     def sizeHint(self):
         return QSize(self.codeEditor.lineNumberAreaWidth(), 0)
@@ -51,32 +142,134 @@ class LineNumberArea(QWidget):
 
 class CodeEditor(QPlainTextEdit):
     updateRequest = pyqtSignal(QRect, int)
-    
+
+    # Caracteres de fin de palabra; frozenset para membresía O(1) en keyPressEvent.
+    _EOW = frozenset("~!@#$%^&*()_+{}|:\"<>?,./;'[]\\-=")
+    _CTRL_OR_SHIFT = frozenset({Qt.ControlModifier, Qt.ShiftModifier})
+
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._cached_digits = -1
+        self._cached_width = 0
         self.setFont(QFont("Courier", 10))
         self.highlighter = SyntaxHighlighter(self.document())
         self.lineNumberArea = LineNumberArea(self)
 
+        # Selección de línea actual pre-construida: el slot sólo actualiza el cursor.
+        self._line_color = QColor(Qt.yellow).lighter(160)
+        self._cur_line_sel = QTextEdit.ExtraSelection()
+        self._cur_line_sel.format.setBackground(self._line_color)
+        self._cur_line_sel.format.setProperty(QTextCharFormat.FullWidthSelection, True)
+        self._last_cur_block = -1
+
+        # Coalescer: ráfagas de cursorPositionChanged (tecleo rápido, repetición
+        # de flechas) colapsan en una sola actualización por cuadro (~16ms).
+        self._hlTimer = QTimer(self)
+        self._hlTimer.setSingleShot(True)
+        self._hlTimer.setInterval(16)
+        self._hlTimer.timeout.connect(self._doHighlightCurrentLine)
+
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
         self.updateRequest.connect(self.updateLineNumberArea)
         self.cursorPositionChanged.connect(self.highlightCurrentLine)
 
         self.updateLineNumberAreaWidth(0)
 
-        keywords = ["inicio", "fin", "funcion", "retornar", "var", "mientras", "si", "entonces", "fin_si", "sino", "para", "imprimir"]
-        self.completer = QCompleter(keywords, self)
+        # Modelo pre-ordenado: QCompleter usa búsqueda binaria en lugar de
+        # recorrer la lista completa en cada pulsación.
+        self.completer_model = QStringListModel(sorted(_KEYWORDS, key=str.casefold), self)
+        self.completer = QCompleter(self.completer_model, self)
+        self.completer.setModelSorting(QCompleter.CaseInsensitivelySortedModel)
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.setCompleter(self.completer)
 
+        # Identificadores del documento, actualizados de forma incremental
+        # sobre los bloques editados en lugar de re-escanear todo el texto.
+        self._ident_set = set(_KEYWORDS)
+        self.document().contentsChange.connect(self._on_contents_change)
+
+        self._last_prefix = None
+
+    def setFont(self, font):
+        super().setFont(font)
+        # El avance de un dígito, el ancho cacheado y los glifos cacheados
+        # dependen de la métrica de la fuente: se refrescan sólo aquí.
+        self._digitAdvance = self.fontMetrics().horizontalAdvance('9')
+        self._cached_digits = -1
+        if hasattr(self, 'lineNumberArea'):
+            self.lineNumberArea.invalidateNumberCache()
+
+    def setPlainTextBulk(self, text):
+        """Carga texto grande sin resaltar todo el documento de forma síncrona.
+
+        El resaltador se silencia durante setPlainText; después se re-resaltan
+        primero los bloques visibles y el resto en tandas desde el event loop,
+        de modo que la latencia de apertura no dependa del tamaño del archivo.
+        """
+        # Repintados suspendidos durante la inserción: el documento se arma
+        # completo antes de que el viewport vuelva a dibujar.
+        self.setUpdatesEnabled(False)
+        self.highlighter._bulk_loading = True
+        try:
+            self.setPlainText(text)
+        finally:
+            self.highlighter._bulk_loading = False
+            self.setUpdatesEnabled(True)
+        self._pending_rehighlight = 0
+        QTimer.singleShot(0, self._highlightVisibleThenQueue)
+
+    def _highlightVisibleThenQueue(self):
+        rehighlight = self.highlighter.rehighlightBlock
+        viewport_bottom = self.viewport().height()
+        block = self.firstVisibleBlock()
+        while block.isValid():
+            top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+            if top > viewport_bottom:
+                break
+            rehighlight(block)
+            block = block.next()
+        QTimer.singleShot(0, self._rehighlightChunk)
+
+    def _rehighlightChunk(self):
+        rehighlight = self.highlighter.rehighlightBlock
+        block = self.document().findBlockByNumber(self._pending_rehighlight)
+        n = 0
+        while block.isValid() and n < 200:
+            rehighlight(block)
+            block = block.next()
+            n += 1
+        if block.isValid():
+            self._pending_rehighlight += n
+            QTimer.singleShot(0, self._rehighlightChunk)
+
+    def _on_contents_change(self, position, removed, added):
+        doc = self.document()
+        block = doc.findBlock(position)
+        last = doc.findBlock(position + added)
+        new_idents = []
+        while block.isValid():
+            for match in _IDENT_RE.finditer(block.text()):
+                ident = match.group()
+                if ident not in self._ident_set:
+                    self._ident_set.add(ident)
+                    new_idents.append(ident)
+            if block == last:
+                break
+            block = block.next()
+        if new_idents:
+            words = self.completer_model.stringList()
+            for ident in new_idents:
+                bisect.insort(words, ident, key=str.casefold)
+            self.completer_model.setStringList(words)
+
     def lineNumberAreaWidth(self):
-        digits = 1
-        max_ = max(1, self.blockCount())
-        while max_ >= 10:
-            max_ //= 10
-            digits += 1
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
-        return space
+        digits = len(str(max(1, self.blockCount())))
+        if digits == self._cached_digits:
+            return self._cached_width
+        self._cached_digits = digits
+        self._cached_width = 3 + self._digitAdvance * digits
+        return self._cached_width
 
     def updateLineNumberAreaWidth(self, _):
         self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
@@ -96,38 +289,52 @@ class CodeEditor(QPlainTextEdit):
         self.lineNumberArea.setGeometry(QRect(cr.left(), cr.top(), self.lineNumberAreaWidth(), cr.height()))
 
     def highlightCurrentLine(self):
-        extraSelections = []
+        self._hlTimer.start()
 
-        if not self.isReadOnly():
-            selection = QTextEdit.ExtraSelection()
-            lineColor = QColor(Qt.yellow).lighter(160)
-            selection.format.setBackground(lineColor)
-            selection.format.setProperty(QTextCharFormat.FullWidthSelection, True)
-            selection.cursor = self.textCursor()
-            selection.cursor.clearSelection()
-            extraSelections.append(selection)
-
-        self.setExtraSelections(extraSelections)
+    def _doHighlightCurrentLine(self):
+        if self.isReadOnly():
+            self.setExtraSelections([])
+            return
+        # Movimientos horizontales no cambian la línea resaltada: evitar el
+        # costoso setExtraSelections si el bloque es el mismo.
+        block = self.textCursor().blockNumber()
+        if block == self._last_cur_block:
+            return
+        self._last_cur_block = block
+        self._cur_line_sel.cursor = self.textCursor()
+        self._cur_line_sel.cursor.clearSelection()
+        self.setExtraSelections([self._cur_line_sel])
 
     def lineNumberAreaPaintEvent(self, event):
         painter = QPainter(self.lineNumberArea)
         painter.fillRect(event.rect(), Qt.lightGray)
+        painter.setPen(Qt.black)
+
+        # Valores invariantes del bucle, resueltos una sola vez por pintado.
+        event_rect = event.rect()
+        area_width = self.lineNumberArea.width()
 
         block = self.firstVisibleBlock()
         blockNumber = block.blockNumber()
         top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
-        bottom = top + int(self.blockBoundingRect(block).height())
+        block_height = int(self.blockBoundingRect(block).height())
+        bottom = top + block_height
+
+        # Sin ajuste de línea todos los bloques miden lo mismo: basta una sola
+        # consulta de blockBoundingRect para todo el bucle.
+        uniform_height = self.lineWrapMode() == QPlainTextEdit.NoWrap
 
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(blockNumber + 1)
-                painter.setPen(Qt.black)
-                painter.drawText(0, top, self.lineNumberArea.width(), self.fontMetrics().height(),
-                                 Qt.AlignRight, number)
+        while block.isValid() and top <= event_rect.bottom():
+            block_rect = QRect(0, top, area_width, bottom - top)
+            if block.isVisible() and event_rect.intersects(block_rect):
+                st = self.lineNumberArea.staticNumber(blockNumber + 1)
+                painter.drawStaticText(area_width - int(st.size().width()), top, st)
 
             block = block.next()
             top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
+            if not uniform_height and block.isValid():
+                block_height = int(self.blockBoundingRect(block).height())
+            bottom = top + block_height
             blockNumber += 1
 
     def setCompleter(self, completer):
@@ -158,18 +365,29 @@ class CodeEditor(QPlainTextEdit):
         if not self.completer or not isShortcut:
             super().keyPressEvent(event)
 
-        ctrlOrShift = event.modifiers() in (Qt.ControlModifier, Qt.ShiftModifier)
+        ctrlOrShift = event.modifiers() in self._CTRL_OR_SHIFT
         if not self.completer or (ctrlOrShift and len(event.text()) == 0):
             return
 
-        eow = "~!@#$%^&*()_+{}|:\"<>?,./;'[]\\-="  # End of word
         hasModifier = (event.modifiers() != Qt.NoModifier) and not ctrlOrShift
-        completionPrefix = self.textUnderCursor()
+        text = event.text()
 
-        if not isShortcut and (hasModifier or len(event.text()) == 0 or len(completionPrefix) < 1 or event.text()[-1] in eow):
+        # Teclas que no forman palabra se descartan antes de tocar el cursor:
+        # textUnderCursor crea y mueve un QTextCursor en cada llamada.
+        if not isShortcut and (hasModifier or not text or text[-1] in self._EOW):
+            self.completer.popup().hide()
+            return
+
+        completionPrefix = self.textUnderCursor()
+        if not isShortcut and len(completionPrefix) < 1:
             self.completer.popup().hide()
             return
 
+        # Prefijo sin cambios con el popup ya visible: no hay nada que refiltrar.
+        if completionPrefix == self._last_prefix and self.completer.popup().isVisible():
+            return
+        self._last_prefix = completionPrefix
+
         if completionPrefix != self.completer.completionPrefix():
             self.completer.setCompletionPrefix(completionPrefix)
             self.completer.popup().setCurrentIndex(self.completer.completionModel().index(0, 0))
@@ -183,62 +401,66 @@ class CodeEditor(QPlainTextEdit):
         tc.select(QTextCursor.WordUnderCursor)
         return tc.selectedText()
 
+# Despacho del validador: primera palabra de la línea -> patrón a exigir.
+_VALIDATORS = {
+    'var': _RE_VAR,
+    'funcion': _RE_FUNC,
+    'imprimir': _RE_IMPRIMIR,
+    'si': _RE_SI,
+    'para': _RE_PARA,
+}
+# Palabras clave que forman una línea válida por sí mismas.
+_NOCHECK = frozenset({'inicio', 'fin', 'retornar', 'mientras', 'entonces',
+                      'fin_si', 'sino', 'fin_para'})
+
 def validar_codigo(codigo):
-    keywords = ["inicio", "fin", "funcion", "retornar", "var", "mientras", "si", "entonces", "fin_si", "sino", "para", "imprimir"]
-    lines = codigo.split('\n')
+    # splitlines es más barato que split('\n') y normaliza también \r\n.
+    lines = codigo.splitlines()
     in_function = False
-    
+    validator_for = _VALIDATORS.get
+
     for line_num, line in enumerate(lines, start=1):
         stripped_line = line.strip()
         if stripped_line == "":
             continue
-        
-        # Check for valid variable declaration
-        if stripped_line.startswith("var"):
-            if not re.match(r'^var\s+\w+\s*=\s*.+$', stripped_line):
-                return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
-        
-        # Check for function definition
-        elif stripped_line.startswith("funcion"):
-            if not re.match(r'^funcion\s+\w+\s*\(.*\)\s*$', stripped_line):
+
+        # Una sola extracción del primer token y un lookup O(1), en lugar de
+        # la cadena de startswith por cada palabra clave. maxsplit=1 corta en
+        # cualquier blanco, igual que el \s+ de los patrones.
+        kw = stripped_line.split(maxsplit=1)[0]
+        validator = validator_for(kw)
+        if validator is not None:
+            if not validator.match(stripped_line):
                 return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
-            in_function = True
-        
-        elif stripped_line.startswith("fin_funcion"):
+            if kw == 'funcion':
+                in_function = True
+        elif kw == 'fin_funcion':
             if not in_function:
                 return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
             in_function = False
-        
-        # Check for valid print statement
-        elif stripped_line.startswith("imprimir"):
-            if not re.match(r'^imprimir\s+.+$', stripped_line):
-                return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
-        
-        # Check for if statement
-        elif stripped_line.startswith("si"):
-            if not re.match(r'^si\s+.+\s+entonces\s*$', stripped_line):
-                return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
-        
-        elif stripped_line.startswith("fin_si"):
-            pass
-        
-        elif stripped_line.startswith("sino"):
-            pass
-        
-        # Check for loop
-        elif stripped_line.startswith("para"):
-            if not re.match(r'^para\s+var\s+\w+\s*=\s*.+;\s*.+;\s*.+$', stripped_line):
-                return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
-        
-        elif stripped_line.startswith("fin_para"):
-            pass
-        
-        # Ensure no invalid lines
-        elif not any(stripped_line.startswith(kw) for kw in keywords):
+        elif kw not in _NOCHECK:
             return f"Error de sintaxis en la línea {line_num}: {stripped_line}"
-    
+
     return "El código es válido."
 
+class FileLoaderThread(QThread):
+    """Lee y decodifica un archivo fuera del hilo de UI.
+
+    El documento se rellena en el hilo principal vía setPlainTextBulk (los
+    QTextDocument no pueden poblarse con seguridad desde otro hilo), pero la
+    E/S y la decodificación —lo que bloquea en archivos grandes— ocurren aquí.
+    """
+    loaded = pyqtSignal(str)
+
+    def __init__(self, file_name, parent=None):
+        super().__init__(parent)
+        self.file_name = file_name
+
+    def run(self):
+        with open(self.file_name, 'rb', buffering=1 << 20) as file:
+            data = file.read()
+        self.loaded.emit(data.decode('utf-8', errors='replace'))
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -252,6 +474,8 @@ class MainWindow(QMainWindow):
         # Árbol de sintaxis
         self.syntax_tree = QTreeWidget()
         self.syntax_tree.setHeaderLabels(["Árbol de Sintaxis"])
+        # Altura uniforme: Qt usa su ruta rápida de scroll/layout para el árbol.
+        self.syntax_tree.setUniformRowHeights(True)
         dock_tree = QDockWidget("Árbol de Sintaxis")
         dock_tree.setWidget(self.syntax_tree)
         self.addDockWidget(Qt.LeftDockWidgetArea, dock_tree)
@@ -273,8 +497,35 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         
-        # Estado inicial del tema
+        # Estado inicial del tema; paletas y hojas de estilo pre-construidas
+        # para no reconstruirlas en cada toggle.
         self.dark_mode = False
+        self._dark_palette = self.palette()
+        self._dark_palette.setColor(self.backgroundRole(), QColor(53, 53, 53))
+        self._dark_palette.setColor(self.foregroundRole(), Qt.white)
+        self._light_palette = self.palette()
+        self._light_palette.setColor(self.backgroundRole(), Qt.white)
+        self._light_palette.setColor(self.foregroundRole(), Qt.black)
+        self._dark_css = "background-color: #2b2b2b; color: #ffffff;"
+        self._light_css = "background-color: #ffffff; color: #000000;"
+
+        # Programa pre-parseado para run_code (se invalida al cambiar la fuente del código)
+        self._compiled_program = None
+        self._compiled_source = None
+
+        # Salida del intérprete acumulada y volcada en bloque a la consola.
+        self._out_buf = []
+
+        # Despacho O(1) por etiqueta de op; las etiquetas de cierre no necesitan manejador.
+        self._op_handlers = {
+            'VAR': self._op_var,
+            'PRINT_LIT': self._op_print_lit,
+            'PRINT_EXPR': self._op_print_expr,
+            'IF': self._op_if,
+            'ELSE': self._op_else,
+            'FOR': self._op_for,
+            'FUNC': self._op_func,
+        }
 
     def create_menu(self):
         menubar = self.menuBar()
@@ -326,8 +577,10 @@ class MainWindow(QMainWindow):
                                                    "Archivos de Texto (*.txt);;Todos los Archivos (*)", 
                                                    options=options)
         if file_name:
-            with open(file_name, 'r') as file:
-                self.code_editor.setPlainText(file.read())
+            self._loader = FileLoaderThread(file_name, self)
+            self._loader.loaded.connect(self.code_editor.setPlainTextBulk)
+            self._loader.finished.connect(self._loader.deleteLater)
+            self._loader.start()
 
     def save_file(self):
         options = QFileDialog.Options()
@@ -338,93 +591,222 @@ class MainWindow(QMainWindow):
             with open(file_name, 'w') as file:
                 file.write(self.code_editor.toPlainText())
 
-    def run_code(self):
-        code = self.code_editor.toPlainText()
-        lines = code.split('\n')
-        variables = {}
-        functions = {}
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith("var"):
-                var_name, var_value = line[len("var"):].split('=')
-                var_name = var_name.strip()
-                var_value = var_value.strip()
-                try:
-                    variables[var_name] = eval(var_value, {}, variables)
-                except Exception as e:
-                    self.output_console.appendPlainText(f'Error: valor inválido para la variable {var_name} en la línea {i+1}')
-                    return
-            elif line.startswith("funcion"):
-                func_name = line[len("funcion"):].strip()
-                func_body = []
-                i += 1
-                while not lines[i].strip().startswith("fin_funcion"):
-                    func_body.append(lines[i])
-                    i += 1
-                functions[func_name] = func_body
-            elif line.startswith("imprimir"):
+    def _compile_program(self, code):
+        """Parsea el código una sola vez a una lista de tuplas (op, args).
+
+        Los bloques si/para/funcion resuelven su índice de cierre en la misma
+        pasada mediante una pila, de modo que la ejecución nunca vuelve a
+        escanear el texto fuente.
+        """
+        ops = []
+        ops_append = ops.append
+        stack = []
+
+        def close_block(end):
+            # El índice de cierre vive en un campo distinto según la op que se
+            # abrió; resolver por etiqueta tolera cerradores cruzados
+            # (p. ej. fin_para sobre un si) sin reventar con IndexError.
+            op = ops[stack.pop()]
+            op[5 if op[0] == 'FOR' else 1 if op[0] == 'ELSE' else 2] = end
+
+        for line_num, raw in enumerate(code.splitlines(), start=1):
+            line = raw.strip()
+            # Despacho por la primera palabra completa: un prefijo crudo
+            # confundiría sino con si o un identificador varx con var.
+            kw = line.split(maxsplit=1)[0] if line else ''
+            if kw == 'var':
+                # partition devuelve tres rebanadas sin lista intermedia.
+                var_name, _, var_value = line[3:].partition('=')
+                ops_append(['VAR', var_name.strip(), self._compile_expr(var_value.strip()), line_num])
+            elif kw == 'funcion':
+                stack.append(len(ops))
+                ops_append(['FUNC', line[len("funcion"):].strip(), None, line_num])
+            elif kw == 'fin_funcion':
+                if stack:
+                    close_block(len(ops))
+                ops_append(['ENDFUNC'])
+            elif kw == 'imprimir':
                 message = line[len("imprimir"):].strip()
                 if message.startswith('"') and message.endswith('"'):
-                    message = message[1:-1]
+                    ops_append(['PRINT_LIT', message[1:-1], line_num])
                 else:
-                    try:
-                        message = eval(message, {}, variables)
-                    except Exception as e:
-                        self.output_console.appendPlainText(f'Error: expresión inválida en la línea {i+1}')
-                        return
-                self.output_console.appendPlainText(str(message))
-            elif line.startswith("si"):
-                condition = line[len("si"):].strip().split("entonces")[0].strip()
-                if "==" in condition:
-                    var_name, value = condition.split("==")
-                    var_name = var_name.strip()
-                    value = value.strip()
-                    i += 1
-                    if variables.get(var_name) == eval(value, {}, variables):
-                        while i < len(lines) and not lines[i].strip().startswith("fin_si"):
-                            inner_line = lines[i].strip()
-                            if inner_line.startswith("imprimir"):
-                                message = inner_line[len("imprimir"):].strip()
-                                if message.startswith('"') and message.endswith('"'):
-                                    message = message[1:-1]
-                                else:
-                                    try:
-                                        message = eval(message, {}, variables)
-                                    except Exception as e:
-                                        self.output_console.appendPlainText(f'Error: expresión inválida en la línea {i+1}')
-                                        return
-                                self.output_console.appendPlainText(str(message))
-                            i += 1
-            elif line.startswith("para"):
+                    ops_append(['PRINT_EXPR', self._compile_expr(message), line_num])
+            elif kw == 'si':
+                condition = line[2:].partition("entonces")[0].strip()
+                stack.append(len(ops))
+                ops_append(['IF', self._compile_expr(condition), None, line_num])
+            elif kw == 'sino':
+                # El si falso salta aquí (la rama sino empieza en ELSE + 1);
+                # la rama verdadera ejecuta ELSE y salta a su cierre.
+                if stack:
+                    close_block(len(ops))
+                stack.append(len(ops))
+                ops_append(['ELSE', None, line_num])
+            elif kw == 'fin_si':
+                if stack:
+                    close_block(len(ops))
+                ops_append(['ENDIF'])
+            elif kw == 'para':
                 parts = line[len("para"):].split(';')
                 if len(parts) != 3:
                     self.output_console.appendPlainText('Error: sintaxis incorrecta en el bucle para')
-                    return
+                    return None
                 var_init, condition, increment = parts
-                var_name, var_value = var_init.split('=')
+                var_name, _, var_value = var_init.partition('=')
                 var_name = var_name.strip()
-                var_value = var_value.strip()
-                variables[var_name] = eval(var_value, {}, variables)
-                exec(f"{var_name} = {var_value}", {}, variables)  # Ejecutar la inicialización de la variable
-                while eval(condition, {}, variables):
-                    i += 1
-                    while i < len(lines) and not lines[i].strip().startswith("fin_para"):
-                        inner_line = lines[i].strip()
-                        if inner_line.startswith("imprimir"):
-                            message = inner_line[len("imprimir"):].strip()
-                            if message.startswith('"') and message.endswith('"'):
-                                message = message[1:-1]
-                            else:
-                                try:
-                                    message = eval(message, {}, variables)
-                                except Exception as e:
-                                    self.output_console.appendPlainText(f'Error: expresión inválida en la línea {i+1}')
-                                    return
-                            self.output_console.appendPlainText(str(message))
-                        i += 1
-                    exec(increment, {}, variables)  # Ejecutar el incremento de la variable
+                # 'var' como palabra completa: un identificador varx no es
+                # una declaración con prefijo.
+                head = var_name.split(maxsplit=1)
+                if len(head) == 2 and head[0] == 'var':
+                    var_name = head[1].strip()
+                stack.append(len(ops))
+                ops_append(['FOR', var_name, self._compile_expr(var_value.strip()),
+                            self._compile_expr(condition.strip()),
+                            self._compile_increment(increment.strip()), None, line_num])
+            elif kw == 'fin_para':
+                if stack:
+                    close_block(len(ops))
+                ops_append(['ENDFOR'])
+        # Bloques sin cerrar saltan al final del programa.
+        while stack:
+            close_block(len(ops))
+        return [tuple(op) for op in ops]
+
+    def _emit(self, text):
+        # Cada appendPlainText re-maqueta el documento de la consola; acumular
+        # y volcar cada 1000 mensajes mantiene la UI viva en ejecuciones largas.
+        self._out_buf.append(text)
+        if len(self._out_buf) >= 1000:
+            self._flush_output()
+
+    def _flush_output(self):
+        # insertPlainText sobre el cursor al final inserta el bloque entero en
+        # una sola edición del documento, sin el párrafo extra que añade
+        # appendPlainText por llamada.
+        if self._out_buf:
+            self._out_buf.append('')
+            cursor = self.output_console.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText('\n'.join(self._out_buf))
+            self.output_console.setTextCursor(cursor)
+            self._out_buf.clear()
+
+    @staticmethod
+    def _compile_expr(text):
+        # Expresiones compiladas en el momento del parseo; si el texto no
+        # compila se conserva tal cual y el error aflora al evaluarlo, con el
+        # mismo mensaje de línea que antes.
+        try:
+            return compile(text, '<run>', 'eval')
+        except SyntaxError:
+            return text
+
+    @staticmethod
+    def _compile_stmt(text):
+        try:
+            return compile(text, '<run>', 'exec')
+        except SyntaxError:
+            return text
+
+    _INC_RE = re.compile(r'^(\w+)\s*=\s*\1\s*\+\s*(\d+)$|^(\w+)\s*\+=\s*(\d+)$')
+
+    @classmethod
+    def _compile_increment(cls, text):
+        # Incrementos triviales (i = i + 1, i += 1) se reducen a una clausura
+        # que muta variables directamente, sin pasar por exec.
+        m = cls._INC_RE.match(text)
+        if m is not None:
+            if m.group(1) is not None:
+                name, step = m.group(1), int(m.group(2))
+            else:
+                name, step = m.group(3), int(m.group(4))
+
+            def inc(variables, _name=name, _step=step):
+                variables[_name] += _step
+            return inc
+        return cls._compile_stmt(text)
+
+    # Los manejadores devuelven el índice desde el que continuar, o -1 en error.
+    def _op_var(self, op, i, ops, variables, functions):
+        try:
+            variables[op[1]] = eval(op[2], {}, variables)
+        except Exception:
+            self._emit(f'Error: valor inválido para la variable {op[1]} en la línea {op[3]}')
+            return -1
+        return i
+
+    def _op_print_lit(self, op, i, ops, variables, functions):
+        self._emit(op[1])
+        return i
+
+    def _op_print_expr(self, op, i, ops, variables, functions):
+        try:
+            message = eval(op[1], {}, variables)
+        except Exception:
+            self._emit(f'Error: expresión inválida en la línea {op[2]}')
+            return -1
+        self._emit(str(message))
+        return i
+
+    def _op_if(self, op, i, ops, variables, functions):
+        try:
+            condition = eval(op[1], {}, variables)
+        except Exception:
+            self._emit(f'Error: expresión inválida en la línea {op[3]}')
+            return -1
+        return i if condition else op[2]
+
+    def _op_else(self, op, i, ops, variables, functions):
+        # Sólo se ejecuta cuando la rama verdadera cae sobre él: saltar el sino.
+        return op[1]
+
+    def _op_for(self, op, i, ops, variables, functions):
+        _, var_name, init, condition, increment, end_idx, line_num = op
+        try:
+            variables[var_name] = eval(init, {}, variables)
+            fast_inc = increment if callable(increment) else None
+            while eval(condition, {}, variables):
+                if not self._exec_ops(ops, i + 1, end_idx, variables, functions):
+                    return -1
+                if fast_inc is not None:
+                    fast_inc(variables)
+                else:
+                    exec(increment, {}, variables)
+        except Exception:
+            self._emit(f'Error: expresión inválida en la línea {line_num}')
+            return -1
+        return end_idx
+
+    def _op_func(self, op, i, ops, variables, functions):
+        functions[op[1]] = ops[i + 1:op[2]]
+        return op[2]
+
+    def _exec_ops(self, ops, start, end, variables, functions):
+        dispatch = self._op_handlers
+        i = start
+        while i < end:
+            handler = dispatch.get(ops[i][0])
+            if handler is not None:
+                i = handler(ops[i], i, ops, variables, functions)
+                if i < 0:
+                    return False
             i += 1
+        return True
+
+    def run_code(self):
+        code = self.code_editor.toPlainText()
+        if self._compiled_program is None or self._compiled_source != code:
+            self._compiled_program = self._compile_program(code)
+            self._compiled_source = code
+        if self._compiled_program is None:
+            return
+        variables = {}
+        functions = {}
+        self._out_buf = []
+        try:
+            self._exec_ops(self._compiled_program, 0, len(self._compiled_program), variables, functions)
+        finally:
+            self._flush_output()
 
     def analyze_code(self):
         code = self.code_editor.toPlainText()
@@ -453,6 +835,10 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Error semántico", 2000)
             return
         
+        # Reconstruir el programa pre-parseado para run_code
+        self._compiled_program = self._compile_program(code)
+        self._compiled_source = code
+
         # Mostrar resultados
         self.output_console.appendPlainText("Análisis completado exitosamente")
         self.status_bar.showMessage("Análisis completado", 2000)
@@ -460,39 +846,38 @@ class MainWindow(QMainWindow):
         # Mostrar árbol de sintaxis
         self.display_syntax_tree(parse_tree)
         
+    def _lexical_error(self, code, pos):
+        value = code[pos]
+        line_num = code.count('\n', 0, pos) + 1
+        self.output_console.appendPlainText(f'Error léxico: {value} inesperado en la línea {line_num}')
+
     def lexer(self, code):
-        keywords = {"inicio", "fin", "funcion", "retornar", "var", "mientras", "si", "entonces", "fin_si", "sino", "para", "imprimir"}
-        token_specification = [
-            ('STRING',  r'"[^"]*"'),       # String literal
-            ('NUMBER',  r'\d+'),           # Integer or decimal number
-            ('ID',      r'[A-Za-z_]\w*'),  # Identifiers
-            ('OP',      r'[+\-*/=<>]'),    # Arithmetic and comparison operators
-            ('NEWLINE', r'\n'),            # Line endings
-            ('SKIP',    r'[ \t]+'),        # Skip over spaces and tabs
-            ('MISMATCH',r'.'),             # Any other character
-        ]
-        tok_regex = '|'.join(f'(?P<{pair[0]}>{pair[1]})' for pair in token_specification)
-        get_token = re.compile(tok_regex).match
-        line_num = 1
-        line_start = 0
+        # Nombres calientes ligados a locales (LOAD_FAST) para el bucle por token.
+        keywords = _KEYWORDS
         tokens = []
-        mo = get_token(code)
-        while mo is not None:
+        tokens_append = tokens.append
+        pos = 0
+        for mo in _LEXER_RE.finditer(code):
+            start = mo.start()
+            if start != pos:
+                gap = code[pos:start]
+                if gap.strip():
+                    self._lexical_error(code, pos + (len(gap) - len(gap.lstrip())))
+                    return None
+            pos = mo.end()
             kind = mo.lastgroup
-            value = mo.group()
             if kind == 'NEWLINE':
-                line_start = mo.end()
-                line_num += 1
-            elif kind == 'SKIP':
-                pass
-            elif kind == 'MISMATCH':
-                self.output_console.appendPlainText(f'Error léxico: {value} inesperado en la línea {line_num}')
-                return None
-            else:
-                if kind == 'ID' and value in keywords:
-                    kind = value.upper()
-                tokens.append((kind, value))
-            mo = get_token(code, mo.end())
+                continue
+            value = mo.group()
+            if kind == 'ID' and value in keywords:
+                # Internado: las clases de palabra clave comparten una única
+                # instancia, así los == del parser resuelven por identidad.
+                kind = sys.intern(value.upper())
+            tokens_append((kind, value))
+        if code[pos:].strip():
+            tail = code[pos:]
+            self._lexical_error(code, pos + (len(tail) - len(tail.lstrip())))
+            return None
         return tokens
 
     def parser(self, tokens):
@@ -500,65 +885,86 @@ class MainWindow(QMainWindow):
             self.output_console.appendPlainText('Error sintáctico: el código debe comenzar con "inicio" y terminar con "fin".')
             return None
         
+        # Forma SoA: listas paralelas de clases y valores. Las comparaciones de
+        # clase indexan una lista plana en lugar de desreferenciar tuplas.
+        kinds = [t[0] for t in tokens]
+        values = [t[1] for t in tokens]
+        n = len(tokens)
+
         i = 0
         parse_tree = QTreeWidgetItem(["inicio"])
         current_node = parse_tree
-        while i < len(tokens):
-            kind, value = tokens[i]
+
+        # Hijos del nodo actual acumulados y volcados con un solo addChildren
+        # por ámbito, en lugar de una notificación de modelo por addChild.
+        pending = []
+
+        def flush():
+            if pending:
+                current_node.addChildren(pending)
+                pending.clear()
+
+        while i < n:
+            kind = kinds[i]
             if kind == 'IMPRIMIR':
-                if i + 1 >= len(tokens) or tokens[i + 1][0] not in {'ID', 'NUMBER', 'STRING'}:
+                if i + 1 >= n or kinds[i + 1] not in {'ID', 'NUMBER', 'STRING'}:
                     self.output_console.appendPlainText(f'Error sintáctico: se esperaba un identificador, número o cadena después de "imprimir" en la posición {i}')
                     return None
-                node = QTreeWidgetItem([f'imprimir {tokens[i + 1][1]}'])
-                current_node.addChild(node)
+                pending.append(QTreeWidgetItem([_LBL_IMPRIMIR + values[i + 1]]))
                 i += 1
             elif kind == 'SI':
-                condition = []
                 i += 1
-                while i < len(tokens) and tokens[i][0] != 'ENTONCES':
-                    condition.append(tokens[i][1])
-                    i += 1
-                if i >= len(tokens) or tokens[i][0] != 'ENTONCES':
+                # takewhile corre el bucle de acumulación dentro de itertools (C).
+                cond_len = sum(1 for _ in takewhile(lambda k: k != 'ENTONCES', islice(kinds, i, None)))
+                start = i
+                i += cond_len
+                if i >= n or kinds[i] != 'ENTONCES':
                     self.output_console.appendPlainText(f'Error sintáctico: se esperaba "entonces" después de la condición del si')
                     return None
-                condition_str = ' '.join(condition)
-                condition_node = QTreeWidgetItem([f'si {condition_str} entonces'])
-                current_node.addChild(condition_node)
+                condition_str = ' '.join(values[start:i])
+                condition_node = QTreeWidgetItem([_LBL_SI + condition_str + ' entonces'])
+                pending.append(condition_node)
+                flush()
                 current_node = condition_node
                 i += 1
             elif kind == 'FIN_SI':
+                flush()
                 current_node = current_node.parent()
             elif kind == 'SINO':
+                flush()
                 sino_node = QTreeWidgetItem(["sino"])
                 current_node.parent().addChild(sino_node)
                 current_node = sino_node
             elif kind == 'VAR':
                 var_node = QTreeWidgetItem(['var'])
-                current_node.addChild(var_node)
+                pending.append(var_node)
                 i += 1
-                declaration = []
-                while i < len(tokens) and tokens[i][0] != 'NEWLINE':
-                    declaration.append(tokens[i][1])
-                    i += 1
-                var_node.addChild(QTreeWidgetItem([' '.join(declaration)]))
+                decl_len = sum(1 for _ in takewhile(lambda k: k != 'NEWLINE', islice(kinds, i, None)))
+                var_node.addChild(QTreeWidgetItem([' '.join(values[i:i + decl_len])]))
+                i += decl_len
             elif kind == 'FUNCION':
-                func_name = tokens[i + 1][1]
-                func_node = QTreeWidgetItem([f'funcion {func_name}'])
-                current_node.addChild(func_node)
+                func_name = values[i + 1]
+                func_node = QTreeWidgetItem([_LBL_FUNCION + func_name])
+                pending.append(func_node)
+                flush()
                 current_node = func_node
                 i += 1
             elif kind == 'FIN_FUNCION':
+                flush()
                 current_node = current_node.parent()
             elif kind == 'PARA':
-                para_node = QTreeWidgetItem([f'para {tokens[i+1][1]} {tokens[i+2][1]} {tokens[i+3][1]}'])
-                current_node.addChild(para_node)
+                para_node = QTreeWidgetItem([_LBL_PARA + values[i+1] + ' ' + values[i+2] + ' ' + values[i+3]])
+                pending.append(para_node)
+                flush()
                 current_node = para_node
                 i += 3
             elif kind == 'FIN_PARA':
+                flush()
                 current_node = current_node.parent()
             else:
-                current_node.addChild(QTreeWidgetItem([value]))
+                pending.append(QTreeWidgetItem([values[i]]))
             i += 1
+        flush()
         parse_tree.addChild(QTreeWidgetItem(["fin"]))
         return parse_tree
 
@@ -568,8 +974,16 @@ class MainWindow(QMainWindow):
         return True
 
     def display_syntax_tree(self, parse_tree):
-        self.syntax_tree.clear()
-        self.syntax_tree.addTopLevelItem(parse_tree)
+        # El árbol puede traer miles de items; suspender repintados y señales
+        # durante el intercambio evita una notificación de vista por inserción.
+        self.syntax_tree.setUpdatesEnabled(False)
+        self.syntax_tree.blockSignals(True)
+        try:
+            self.syntax_tree.clear()
+            self.syntax_tree.addTopLevelItem(parse_tree)
+        finally:
+            self.syntax_tree.blockSignals(False)
+            self.syntax_tree.setUpdatesEnabled(True)
 
     def toggle_theme(self):
         if self.dark_mode:
@@ -579,22 +993,14 @@ class MainWindow(QMainWindow):
         self.dark_mode = not self.dark_mode
 
     def set_dark_theme(self):
-        dark_palette = self.palette()
-        dark_palette.setColor(self.backgroundRole(), QColor(53, 53, 53))
-        dark_palette.setColor(self.foregroundRole(), Qt.white)
-        self.setPalette(dark_palette)
-
-        self.code_editor.setStyleSheet("background-color: #2b2b2b; color: #ffffff;")
-        self.output_console.setStyleSheet("background-color: #2b2b2b; color: #ffffff;")
+        self.setPalette(self._dark_palette)
+        self.code_editor.setStyleSheet(self._dark_css)
+        self.output_console.setStyleSheet(self._dark_css)
 
     def set_light_theme(self):
-        light_palette = self.palette()
-        light_palette.setColor(self.backgroundRole(), Qt.white)
-        light_palette.setColor(self.foregroundRole(), Qt.black)
-        self.setPalette(light_palette)
-
-        self.code_editor.setStyleSheet("background-color: #ffffff; color: #000000;")
-        self.output_console.setStyleSheet("background-color: #ffffff; color: #000000;")
+        self.setPalette(self._light_palette)
+        self.code_editor.setStyleSheet(self._light_css)
+        self.output_console.setStyleSheet(self._light_css)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)